@@ -0,0 +1,86 @@
+import functools
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable
+
+import diskcache
+
+# Scrape results are kept on disk for 15 minutes so that repeated commands for the
+# same subreddit, query, and sorting are served without contacting Reddit.
+CACHE_DIRECTORY = "output/.cache"
+CACHE_EXPIRY = 900
+CACHE_TAG = "reddit"
+
+
+@functools.cache
+def get_cache() -> diskcache.Cache:
+    """
+    Returns the disk cache of scrape results, opening it on first use.
+
+    The cache is not opened on import, so that importing Apollo or printing the CLI
+    help does not create the cache directory.
+
+    Returns:
+        (diskcache.Cache): The shared disk cache.
+    """
+
+    return diskcache.Cache(CACHE_DIRECTORY)
+
+
+def memoize_iterator(
+    func: Callable[..., Awaitable[AsyncIterator[Any]]],
+) -> Callable[..., Awaitable[AsyncIterator[Any]]]:
+    """
+    Memoizes a coroutine method that returns an async iterator of picklable items.
+
+    The cache key is built from the method name and its arguments, excluding the
+    instance itself. On a cache miss, items are passed through to the caller as they
+    are produced and each is stored under its own entry as it passes, so that the
+    items are never collected in memory. The number of items is only stored under
+    the key once the iterator has been fully consumed, so an interrupted scrape is
+    never replayed. A result expires CACHE_EXPIRY seconds after its first item was
+    stored, and its items are kept for longer so that none expires while the result
+    is still valid.
+
+    Args:
+        func: The method to memoize.
+
+    Returns:
+        (Callable[..., Awaitable[AsyncIterator[Any]]]): The memoized method.
+    """
+
+    @functools.wraps(func)
+    async def wrapper(self: Any, *args: Any, **kwargs: Any) -> AsyncIterator[Any]:
+        key = (func.__qualname__, args, tuple(sorted(kwargs.items())))
+        count = get_cache().get(key)
+
+        if count is not None:
+            return _replay(key, count)
+
+        return _store_on_exhaustion(key, await func(self, *args, **kwargs))
+
+    return wrapper
+
+
+async def _replay(key: tuple, count: int) -> AsyncIterator[Any]:
+    cache = get_cache()
+
+    for index in range(count):
+        yield cache[(key, index)]
+
+
+async def _store_on_exhaustion(
+    key: tuple, items: AsyncIterator[Any]
+) -> AsyncIterator[Any]:
+    cache = get_cache()
+    started = time.monotonic()
+    count = 0
+
+    async for item in items:
+        cache.set((key, count), item, expire=2 * CACHE_EXPIRY, tag=CACHE_TAG)
+        count += 1
+        yield item
+
+    remaining = CACHE_EXPIRY - (time.monotonic() - started)
+
+    if remaining > 0:
+        cache.set(key, count, expire=remaining, tag=CACHE_TAG)
@@ -1,24 +1,93 @@
+import asyncio
+import functools
+from typing import Any, AsyncIterator, Awaitable, Callable
+
 import typer
+from cache import CACHE_TAG, get_cache
 from config import RedditConfig
-from models import Comment, Post
 from output import OutputManager
+from pushshift import PushshiftClient
 from reddit import RedditScraper
 
 cli = typer.Typer(add_completion=False)
-config = RedditConfig(".env")
-client = config.get_client()
-scraper = RedditScraper(client)
-storage = OutputManager()
+
+
+class CLIState:
+    """
+    A class that holds the objects shared by the commands of a CLI run.
+
+    The configuration, Reddit clients, scraper, and output manager are only built
+    when a command first uses them, so that help output and argument errors do not
+    pay for parsing the configuration or constructing the Reddit clients. As the
+    clients are bound to the event loop they are created in, they are built inside
+    the loop a command runs and closed when it completes.
+
+    Attributes:
+        config_file: Path to the configuration file to load.
+    """
+
+    def __init__(self, config_file: str) -> None:
+        self.config_file = config_file
+
+    @functools.cached_property
+    def config(self) -> RedditConfig:
+        return RedditConfig(self.config_file)
+
+    @functools.cached_property
+    def scraper(self) -> RedditScraper:
+        return RedditScraper(
+            self.config.get_clients(), PushshiftClient(self.config.get_session())
+        )
+
+    @functools.cached_property
+    def storage(self) -> OutputManager:
+        return OutputManager()
+
+    def run(
+        self,
+        scrape: Callable[[RedditScraper], Awaitable[AsyncIterator[Any]]],
+        output_type: str,
+    ) -> None:
+        """
+        Runs a scrape on a new event loop and stores its results as they arrive.
+
+        Args:
+            scrape: A function that starts the scrape with the given scraper.
+            output_type: The format to store the data in.
+
+        Returns:
+            (None)
+        """
+
+        async def scrape_and_store() -> None:
+            try:
+                results = await scrape(self.scraper)
+                await self.storage.store_stream(results, output_type=output_type)
+            finally:
+                await self.config.close()
+
+        asyncio.run(scrape_and_store())
+
+
+@cli.callback()
+def main(ctx: typer.Context) -> None:
+    """
+    Parses and extracts bulk submission data from subreddits.
+    """
+
+    ctx.obj = CLIState(".env")
 
 
 @cli.command(name="keyword-search")
 def search_for_keyword(
+    ctx: typer.Context,
     subreddit_name: str,
     search_query: str,
     sorting: str = "hot",
     interval: str = "day",
     output: str = "json",
-) -> list[Post]:
+    no_cache: bool = typer.Option(False, "--no-cache"),
+) -> None:
     """
     Searches for posts in a subreddit that contain a specific keyword.
 
@@ -27,48 +96,76 @@ def search_for_keyword(
     a specific time interval.
 
     Args:
+        ctx: The Typer context holding the shared CLIState.
         subreddit_name: Name of the subreddit to search in.
         search_query: The keyword to search for.
         sorting: The sorting criteria for the posts (default is "hot").
         interval: The time interval to consider for the posts (default is "day").
-        output: The type of output to generate (default is "json").
+        output: The type of output to generate, one of "json", "jsonl", or
+            "dataclass" (default is "json").
+        no_cache: Whether to discard cached results before scraping (default is
+            False).
 
     Returns:
-        (list[Post]): List of models.Post objects that match the search criteria.
+        (None)
     """
 
+    if no_cache:
+        get_cache().evict(CACHE_TAG)
+
     print("Scraping post data...")
-    post_data = scraper.search_for_keyword(
-        subreddit_name, search_query, sorting, interval, output
+    ctx.obj.run(
+        lambda scraper: scraper.search_for_keyword(
+            subreddit_name, search_query, sorting, interval
+        ),
+        output_type=output,
     )
-    storage.store_output(post_data, output_type=output)
 
 
 @cli.command(name="top-posts")
-def posts_from_half_year(subreddit_name: str, output: str = "json") -> list[Post]:
+def posts_from_half_year(
+    ctx: typer.Context,
+    subreddit_name: str,
+    output: str = "json",
+    no_cache: bool = typer.Option(False, "--no-cache"),
+) -> None:
     """
     Fetches the top posts from the last 26 weeks of a given subreddit.
 
-    This method retrieves the top posts from the past year in the subreddit and then
-    filters out the posts that were created in the last 26 weeks.
+    This method looks up the top posts created in the last 26 weeks through the
+    PullPush mirror of Pushshift and then fetches them from Reddit in batches of 100,
+    falling back to filtering the top posts of the past year if PullPush cannot be
+    reached.
 
     Args:
+        ctx: The Typer context holding the shared CLIState.
         subreddit_name: Name of the subreddit to fetch posts from.
-        output: The type of output to generate (default is "json").
+        output: The type of output to generate, one of "json", "jsonl", or
+            "dataclass" (default is "json").
+        no_cache: Whether to discard cached results before scraping (default is
+            False).
 
     Returns:
-        (list[Post]): List of models.Post objects created in the last 26 weeks.
+        (None)
     """
 
+    if no_cache:
+        get_cache().evict(CACHE_TAG)
+
     print("Scraping post data...")
-    post_data = scraper.posts_from_half_year(subreddit_name, output)
-    storage.store_output(post_data, output_type=output)
+    ctx.obj.run(
+        lambda scraper: scraper.posts_from_half_year(subreddit_name),
+        output_type=output,
+    )
 
 
 @cli.command(name="top-comments")
 def comments_from_half_year(
-    subreddit_name: str, output: str = "json"
-) -> list[list[Comment]]:
+    ctx: typer.Context,
+    subreddit_name: str,
+    output: str = "json",
+    no_cache: bool = typer.Option(False, "--no-cache"),
+) -> None:
     """
     Fetches the top comments from the top posts of the last 26 weeks of a given
     subreddit.
@@ -77,17 +174,25 @@ def comments_from_half_year(
     then fetches the top comments from these posts.
 
     Args:
+        ctx: The Typer context holding the shared CLIState.
         subreddit_name: Name of the subreddit to fetch comments from.
-        output: The type of output to generate (default is "json").
+        output: The type of output to generate, one of "json", "jsonl", or
+            "dataclass" (default is "json").
+        no_cache: Whether to discard cached results before scraping (default is
+            False).
 
     Returns:
-        (list[list[Comment]]): List of lists of models.Comment and each inner list
-            represents the comments of a single post.
+        (None)
     """
 
+    if no_cache:
+        get_cache().evict(CACHE_TAG)
+
     print("Scraping comment data...")
-    comment_data = scraper.comments_from_half_year(subreddit_name, output)
-    storage.store_output(comment_data, output_type=output)
+    ctx.obj.run(
+        lambda scraper: scraper.comments_from_half_year(subreddit_name),
+        output_type=output,
+    )
 
 
 if __name__ == "__main__":
@@ -1,33 +1,116 @@
+import functools
+from typing import Optional
+
+import aiohttp
+import asyncpraw
 import dotenv
-import praw
+
+
+@functools.lru_cache(maxsize=1)
+def _load(config_file: str) -> dict[str, Optional[str]]:
+    return dotenv.dotenv_values(config_file)
 
 
 class RedditConfig:
     """
     A class that handles the configuration needed for Reddit API interaction.
 
-    This class is responsible for loading environment variables and returning a
-    praw.Reddit instance configured with these variables.
+    This class is responsible for loading environment variables and returning
+    asyncpraw.Reddit instances configured with these variables.
+
+    All instances share a single aiohttp.ClientSession with a pooled connector, and
+    are cached so that repeated calls reuse the same clients and their open
+    connections. The connector keeps up to 64 connections alive and caches DNS
+    lookups for five minutes, so requests to oauth.reddit.com and PullPush rarely
+    pay for a new TLS handshake. The session and clients must be created and closed
+    within the same running event loop.
     """
 
     def __init__(self, config_file: str) -> None:
-        dotenv.load_dotenv()
-        self.config = dotenv.dotenv_values(config_file)
+        self.config = _load(config_file)
+        self.__session: Optional[aiohttp.ClientSession] = None
+        self.__client: Optional[asyncpraw.Reddit] = None
+        self.__clients: Optional[list[asyncpraw.Reddit]] = None
 
-    def get_client(self) -> praw.Reddit:
+    def get_session(self) -> aiohttp.ClientSession:
         """
-        Returns a praw.Reddit instance configured with client id, client secret, and
-        user agent.
+        Returns the aiohttp.ClientSession shared by all clients, creating it on first
+        use.
 
         Returns:
-            (praw.Reddit): The configured Reddit instance.
+            (aiohttp.ClientSession): The shared session.
+        """
+
+        if self.__session is None:
+            self.__session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=64, ttl_dns_cache=300)
+            )
+
+        return self.__session
+
+    def get_client(self) -> asyncpraw.Reddit:
+        """
+        Returns an asyncpraw.Reddit instance configured with client id, client secret,
+        and user agent.
+
+        Returns:
+            (asyncpraw.Reddit): The configured Reddit instance.
+        """
+
+        if self.__client is None:
+            self.__client = self.__build_client(
+                self.config["client_id"], self.config["client_secret"]
+            )
+
+        return self.__client
+
+    def get_clients(self) -> list[asyncpraw.Reddit]:
         """
+        Returns an asyncpraw.Reddit instance for every set of credentials in the
+        configuration.
+
+        Numbered credentials (client_id_1, client_secret_1, client_id_2, ...) are read
+        in order until the first missing index. If no numbered credentials are
+        present, the single client id and client secret are used instead.
+
+        Returns:
+            (list[asyncpraw.Reddit]): The configured Reddit instances.
+        """
+
+        if self.__clients is not None:
+            return self.__clients
+
+        clients = []
+        index = 1
+
+        while f"client_id_{index}" in self.config:
+            clients.append(
+                self.__build_client(
+                    self.config[f"client_id_{index}"],
+                    self.config[f"client_secret_{index}"],
+                )
+            )
+            index += 1
+
+        self.__clients = clients or [self.get_client()]
+        return self.__clients
+
+    async def close(self) -> None:
+        """
+        Closes the shared session, and with it every client built from this
+        configuration.
+
+        Returns:
+            (None)
+        """
+
+        if self.__session is not None:
+            await self.__session.close()
 
-        return praw.Reddit(
-            client_id=self.config["client_id"],
-            client_secret=self.config["client_secret"],
-            user_agent=(
-                f"mac:{self.config['client_id']}:v1.0"
-                f" (by u/{self.config['username']})"
-            ),
+    def __build_client(self, client_id: str, client_secret: str) -> asyncpraw.Reddit:
+        return asyncpraw.Reddit(
+            client_id=client_id,
+            client_secret=client_secret,
+            user_agent=f"mac:{client_id}:v1.0 (by u/{self.config['username']})",
+            requestor_kwargs={"session": self.get_session()},
         )
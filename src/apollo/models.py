@@ -1,10 +1,9 @@
-from dataclasses import dataclass
+import msgspec
 
 
-@dataclass
-class Comment:
+class Comment(msgspec.Struct):
     """
-    A dataclass representing scraped comment data.
+    A struct representing scraped comment data.
 
     Attributes:
         author: the Reddit username of the post author.
@@ -17,10 +16,9 @@ class Comment:
     body: str
 
 
-@dataclass
-class Post:
+class Post(msgspec.Struct):
     """
-    A dataclass representing scraped post data.
+    A struct representing scraped post data.
 
     Attributes:
         post_id: the post submission ID.
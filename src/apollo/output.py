@@ -1,6 +1,8 @@
-import json
-import uuid
-from typing import Any
+import os
+from secrets import token_hex
+from typing import Any, AsyncIterable
+
+import msgspec
 
 
 class OutputManager:
@@ -8,35 +10,103 @@ class OutputManager:
     A class that manages the output of the CLI.
 
     This class is responsible for storing the output data from the CLI into
-    a file in a specified format (JSON or dataclass).
+    a file in a specified format (JSON, JSON Lines, or dataclass). The models.Post
+    and models.Comment structs are encoded to JSON by msgspec's compiled encoder,
+    without building intermediate dictionaries.
+
+    Results are stored as they are streamed. Files are written with os.write calls
+    on pre-encoded bytes, bypassing Python's text and buffered file layers, and the
+    items are gathered into chunks of up to WRITE_BUFFER_SIZE bytes, so that each
+    item does not cost a system call.
     """
 
-    def store_output(self, result: Any, output_type: str) -> None:
+    WRITE_BUFFER_SIZE = 64 * 1024
+
+    def __init__(self) -> None:
+        os.makedirs("output", exist_ok=True)
+        self.encoder = msgspec.json.Encoder()
+
+    async def store_stream(self, results: AsyncIterable[Any], output_type: str) -> None:
         """
-        Stores the output data from the CLI into a file in a specified format.
+        Stores the output data from the CLI into a file item by item, as it is
+        produced.
+
+        JSON output is written as a single array whose brackets and separators are
+        written around the items as they arrive, JSON Lines output as one object per
+        line, and dataclass output as one representation per line. Items are not
+        retained once encoded, so the memory used here is bounded by WRITE_BUFFER_SIZE
+        rather than by the number of items. If the results raise an exception, the
+        partially written file is removed before the exception is propagated.
 
         Args:
-            result: The data to store.
+            results: The models.Post or models.Comment objects to store.
             output_type: The format to store the data in (default is "json").
 
         Raises:
-            ValueError: occurs if the output type is not JSON or dataclass.
+            ValueError: occurs if the output type is not JSON, JSON Lines, or
+                dataclass.
 
         Returns:
             (None)
         """
 
         output_type = output_type.lower()
-        file_id = f"{uuid.uuid4()}"[:8]
-        file_ext = "json" if output_type == "json" else "txt"
-        file_path = f"output/{file_id}.{file_ext}"
-
-        with open(file_path, "w", encoding="utf8") as file:
-            if output_type == "json":
-                json.dump(result, file)
-            elif output_type == "dataclass":
-                file.writelines(f"{result}")
-            else:
-                raise ValueError(f"Invalid output type: {output_type}")
+        opening, delimiter, closing = b"", b"", b""
+
+        if output_type == "json":
+            file_ext = "json"
+            encode = self.encoder.encode
+            opening, delimiter, closing = b"[", b",", b"]\n"
+        elif output_type == "jsonl":
+            file_ext = "jsonl"
+            encode = self.__encode_line
+        elif output_type == "dataclass":
+            file_ext = "txt"
+            encode = self.__repr_line
+        else:
+            raise ValueError(f"Invalid output type: {output_type}")
+
+        file_path, fd = self.__create_file(file_ext)
+
+        try:
+            buffer = bytearray(opening)
+            separator = b""
 
+            async for item in results:
+                buffer += separator
+                buffer += encode(item)
+                separator = delimiter
+
+                if len(buffer) >= self.WRITE_BUFFER_SIZE:
+                    self.__write(fd, buffer)
+                    buffer.clear()
+
+            buffer += closing
+            self.__write(fd, buffer)
+        except BaseException:
+            os.close(fd)
+            os.unlink(file_path)
+            raise
+
+        os.close(fd)
         print(f"Successfully stored command output in ./{file_path}")
+
+    def __encode_line(self, item: Any) -> bytearray:
+        line = bytearray()
+        self.encoder.encode_into(item, line)
+        line.extend(b"\n")
+        return line
+
+    def __repr_line(self, item: Any) -> bytes:
+        return f"{item!r}\n".encode("utf8")
+
+    def __create_file(self, file_ext: str) -> tuple[str, int]:
+        file_path = f"output/{token_hex(4)}.{file_ext}"
+        fd = os.open(file_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        return file_path, fd
+
+    def __write(self, fd: int, content: bytes) -> None:
+        view = memoryview(content)
+
+        while view:
+            view = view[os.write(fd, view) :]
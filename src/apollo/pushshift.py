@@ -0,0 +1,117 @@
+import aiohttp
+
+
+class PushshiftClient:
+    """
+    A class that queries the Pushshift API for submission IDs in a time range.
+
+    Unlike the Reddit API, Pushshift supports filtering submissions by creation time,
+    which allows fetching exactly the submissions within a period rather than
+    filtering a wider listing client-side. Requests are sent to PullPush, which
+    serves the Pushshift API since Pushshift itself was restricted to moderators.
+
+    Attributes:
+        session: The aiohttp.ClientSession used to send requests to Pushshift.
+    """
+
+    BASE_URL = "https://api.pullpush.io/reddit/search/submission/"
+    PAGE_SIZE = 100
+    MAX_RESULTS = 1000
+    MAX_PAGES = 25
+    TIMEOUT = aiohttp.ClientTimeout(total=30)
+
+    def __init__(self, session: aiohttp.ClientSession) -> None:
+        self.session = session
+
+    async def submission_ids(
+        self, subreddit_name: str, after: int, before: int
+    ) -> list[str]:
+        """
+        Fetches the IDs of the highest scoring submissions of a subreddit created
+        within a time range.
+
+        Pages are requested in descending order of score, each one restricted to
+        scores no higher than the last score of the previous page, until MAX_RESULTS
+        IDs are found, matching the length of a Reddit listing. When a whole page
+        shares a single score, the submissions with that score are paged through by
+        creation time instead, so that ties cannot stall the score cursor. At most
+        MAX_PAGES requests are sent.
+
+        Args:
+            subreddit_name: Name of the subreddit to search in.
+            after: The UTC timestamp after which submissions were created.
+            before: The UTC timestamp before which submissions were created.
+
+        Raises:
+            aiohttp.ClientError: occurs when PullPush cannot be reached or returns an
+                error status.
+            asyncio.TimeoutError: occurs when a request takes longer than TIMEOUT.
+            KeyError: occurs when a response does not contain any data.
+
+        Returns:
+            (list[str]): List of base36 submission IDs, highest score first as of
+                when PullPush indexed them.
+        """
+
+        params = {
+            "subreddit": subreddit_name,
+            "after": after,
+            "before": before,
+            "size": self.PAGE_SIZE,
+            "sort": "desc",
+            "sort_type": "score",
+            "fields": "id,score,created_utc",
+        }
+
+        submission_ids: dict[str, None] = {}
+        pages = 0
+
+        while len(submission_ids) < self.MAX_RESULTS and pages < self.MAX_PAGES:
+            page = await self.__page(params)
+            pages += 1
+            submission_ids.update(dict.fromkeys(item["id"] for item in page))
+
+            if len(page) < self.PAGE_SIZE:
+                break
+
+            lowest = page[-1]["score"]
+
+            if page[0]["score"] == lowest:
+                pages += await self.__page_tied(
+                    params, lowest, submission_ids, self.MAX_PAGES - pages
+                )
+                params["score"] = f"<{lowest}"
+            else:
+                params["score"] = f"<{lowest + 1}"
+
+        return list(submission_ids)[: self.MAX_RESULTS]
+
+    async def __page_tied(
+        self, params: dict, score: int, submission_ids: dict[str, None], budget: int
+    ) -> int:
+        tied_params = {**params, "score": str(score), "sort_type": "created_utc"}
+        pages = 0
+
+        while len(submission_ids) < self.MAX_RESULTS and pages < budget:
+            page = await self.__page(tied_params)
+            pages += 1
+            found = len(submission_ids)
+            submission_ids.update(dict.fromkeys(item["id"] for item in page))
+
+            if len(page) < self.PAGE_SIZE:
+                break
+
+            # Submissions created in the same second as the end of a page are
+            # requested again, unless that second alone fills a page.
+            oldest = int(page[-1]["created_utc"])
+            tied_params["before"] = (
+                oldest + 1 if len(submission_ids) > found else oldest
+            )
+
+        return pages
+
+    async def __page(self, params: dict) -> list[dict]:
+        async with self.session.get(
+            self.BASE_URL, params=params, raise_for_status=True, timeout=self.TIMEOUT
+        ) as response:
+            return (await response.json())["data"]
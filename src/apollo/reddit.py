@@ -1,31 +1,79 @@
+import asyncio
+import collections
 import datetime
-
-import praw
-import requests
+import itertools
+import operator
+from typing import AsyncIterator, Awaitable, Iterable, Iterator, Optional
+
+import aiohttp
+import asyncpraw
+import asyncprawcore
+from cache import memoize_iterator
 from models import Comment, Post
+from pushshift import PushshiftClient
+
+_REDDIT_URL = "https://reddit.com"
+_HALF_YEAR_SECONDS = 26 * 7 * 24 * 3600
+_POST_FIELDS = operator.attrgetter(
+    "id", "author", "score", "title", "selftext", "permalink", "num_comments"
+)
+_INACCESSIBLE = (
+    asyncprawcore.exceptions.Forbidden,
+    asyncprawcore.exceptions.NotFound,
+    asyncprawcore.exceptions.Redirect,
+)
 
 
 class RedditScraper:
     """
     A class that manages the scraping functionality of Reddit posts and comments.
 
-    This class uses the Reddit API through PRAW to fetch posts and comments from a given
-    subreddit based on certain criteria like keyword search or top posts from a specific
-    period.
+    This class uses the Reddit API through Async PRAW to fetch posts and comments from
+    a given subreddit based on certain criteria like keyword search or top posts from a
+    specific period.
+
+    Comment fetches are spread round-robin across a pool of clients, each with its
+    own credentials, and the clients fetch concurrently on the event loop so that
+    throughput scales with the number of clients. Each client sends one request at
+    a time, so that Async PRAW's rate limiter sees the rate limit headers of the
+    previous response before every request and keeps the client within Reddit's
+    rate limit. Fetches are only started up to FETCH_WINDOW_PER_CLIENT per client
+    ahead of the post being consumed, so the number of scraped posts held in memory
+    does not grow with the number of submissions.
+
+    Fetches that Reddit still rejects for exceeding its rate limit are retried up to
+    MAX_RETRIES times, after the delay requested by Reddit or an exponential
+    backoff.
 
     Attributes:
-        client: A configured instance of the praw.Reddit class for
+        client: A configured instance of the asyncpraw.Reddit class for
             interaction with Reddit's API.
+        clients: The pool of asyncpraw.Reddit instances used to fetch submissions
+            concurrently.
+        pushshift: The PushshiftClient used to find submissions within a time range.
+        accessible: The names of the subreddits that have been validated as
+            accessible.
     """
 
-    def __init__(self, client: praw.Reddit) -> None:
-        self.client = client
+    FETCH_WINDOW_PER_CLIENT = 4
+    MAX_RETRIES = 5
 
-    def fetch_comments(
-        self, post: praw.models.Post, output: str = "json"
-    ) -> list[Comment]:
+    def __init__(
+        self, clients: list[asyncpraw.Reddit], pushshift: PushshiftClient
+    ) -> None:
+        self.client = clients[0]
+        self.clients = clients
+        self.pushshift = pushshift
+        self.accessible: set[str] = set()
+
+    def fetch_comments(self, post: asyncpraw.models.Submission) -> list[Comment]:
         """
-        Fetches the top comments from a given list of Reddit comments.
+        Fetches the top comments from a given Reddit post.
+
+        The comment forest of the post is expected to have been fetched and to have
+        had its asyncpraw.models.MoreComments instances removed with
+        `replace_more(limit=0)`. Comments whose author has been deleted are
+        attributed to "[deleted]".
 
         Args:
             post: Reddit post to fetch comments from.
@@ -35,24 +83,134 @@ class RedditScraper:
                 body content.
         """
 
-        post_comments = []
+        comment_cls = Comment
+        author_name = _author_name
+
+        return [
+            comment_cls(author_name(comment.author), comment.score, comment.body)
+            for comment in post.comments.list()
+        ]
+
+    async def _scrape_one(
+        self,
+        submission: asyncpraw.models.Submission,
+        client: asyncpraw.Reddit,
+        lock: asyncio.Lock,
+    ) -> Post:
+        """
+        Builds a models.Post from a submission, fetching its top comments with the
+        given client once no other fetch of the client is in flight.
+
+        The submission is expected to be already populated, e.g. from a listing or a
+        bulk `info` call, so that only the comment forest requires a request. That
+        request is made through a new, unfetched submission whose comment sort and
+        limit are set before it is loaded, so the forest is fetched once, already
+        sorted and limited, rather than fetched and refetched.
+
+        Args:
+            submission: The submission to build the post from.
+            client: The client to fetch the comments with.
+            lock: The lock serializing the fetches of the client.
 
-        for comment in post.comments.list():
-            if (
-                isinstance(comment, praw.models.Comment)
-                and hasattr(comment, "author")
-                and hasattr(comment, "score")
-                and hasattr(comment, "body")
-            ):
-                comment = Comment(str(comment.author), comment.score, comment.body)
-                post_comments.append(comment.__dict__ if output == "json" else comment)
+        Raises:
+            asyncprawcore.exceptions.TooManyRequests: occurs when Reddit still rejects
+                the fetch after MAX_RETRIES retries.
 
-        return post_comments
+        Returns:
+            (Post): The models.Post built from the submission.
+        """
 
-    def validate_access(self, subreddit_name: str) -> bool:
+        attempt = 0
+
+        async with lock:
+            while True:
+                try:
+                    top_comments = await self.__fetch_top_comments(
+                        submission.id, client
+                    )
+                    break
+                except asyncprawcore.exceptions.TooManyRequests as e:
+                    if attempt == self.MAX_RETRIES:
+                        raise
+
+                    await asyncio.sleep(float(e.retry_after or 2**attempt))
+                    attempt += 1
+
+        post_id, author, score, title, body, permalink, num_comments = _POST_FIELDS(
+            submission
+        )
+
+        return Post(
+            post_id=post_id,
+            author=_author_name(author),
+            score=score,
+            title=title,
+            body=body,
+            url=_REDDIT_URL + permalink,
+            num_comments=num_comments,
+            top_comments=top_comments,
+        )
+
+    async def __fetch_top_comments(
+        self, submission_id: str, client: asyncpraw.Reddit
+    ) -> list[Comment]:
+        commented = await client.submission(submission_id, fetch=False)
+        commented.comment_sort = "confidence"
+        commented.comment_limit = 10
+        await commented.load()
+        await commented.comments.replace_more(limit=0)
+        return self.fetch_comments(commented)
+
+    def __scrape_all(
+        self, submissions: Iterable[asyncpraw.models.Submission]
+    ) -> AsyncIterator[Post]:
+        shards = itertools.cycle([(client, asyncio.Lock()) for client in self.clients])
+
+        fetches = (
+            self._scrape_one(submission, client, lock)
+            for submission, (client, lock) in zip(submissions, shards)
+        )
+
+        return _in_order(fetches, self.FETCH_WINDOW_PER_CLIENT * len(self.clients))
+
+    async def __half_year_submissions(
+        self, subreddit_name: str
+    ) -> list[asyncpraw.models.Submission]:
+        current_time = int(datetime.datetime.now(datetime.timezone.utc).timestamp())
+        cutoff = current_time - _HALF_YEAR_SECONDS
+
+        try:
+            submission_ids = await self.pushshift.submission_ids(
+                subreddit_name, after=cutoff, before=current_time
+            )
+        except (aiohttp.ClientError, asyncio.TimeoutError, KeyError):
+            subreddit = await self.client.subreddit(subreddit_name)
+            return [
+                submission
+                async for submission in subreddit.top(time_filter="year")
+                if submission.created_utc > cutoff
+            ]
+
+        # PullPush scores are snapshots taken when a submission was indexed, so the
+        # submissions are ordered by their current score on Reddit instead.
+        return sorted(
+            [
+                submission
+                async for submission in self.client.info(
+                    fullnames=[f"t3_{pid}" for pid in submission_ids]
+                )
+            ],
+            key=operator.attrgetter("score"),
+            reverse=True,
+        )
+
+    async def validate_access(self, subreddit_name: str) -> bool:
         """
         Validates the access to a given subreddit.
 
+        Subreddits that are found to be accessible are remembered, so that each is
+        only requested once per scraper.
+
         Args:
             subreddit_name: Name of the subreddit to validate.
 
@@ -60,20 +218,25 @@ class RedditScraper:
             (bool): True if the subreddit is accessible, False otherwise.
         """
 
-        try:
-            self.client.subreddit(subreddit_name).subreddit_type
+        if subreddit_name in self.accessible:
             return True
+
+        try:
+            await self.client.subreddit(subreddit_name, fetch=True)
         except Exception:
             return False
 
-    def search_for_keyword(
+        self.accessible.add(subreddit_name)
+        return True
+
+    @memoize_iterator
+    async def search_for_keyword(
         self,
         subreddit_name: str,
         search_query: str,
         sorting: str = "hot",
         interval: str = "day",
-        output: str = "json",
-    ) -> list[Post]:
+    ) -> AsyncIterator[Post]:
         """
         Searches for posts in a subreddit that contain a specific keyword.
 
@@ -81,153 +244,137 @@ class RedditScraper:
         or body. The posts are sorted by a specified criteria (hot, new, top, etc.) and
         from a specific time interval.
 
+        The search results are listed before this coroutine returns; the comments of
+        the posts are then fetched concurrently as the posts are consumed and the
+        posts are yielded in order as they complete. The subreddit is not validated
+        separately, since the search request itself fails if the subreddit cannot be
+        accessed.
+
         Args:
             subreddit_name: Name of the subreddit to search in.
             search_query: The keyword to search for.
             sorting: The sorting criteria for the posts (default is "hot").
             interval: The time interval to consider for the posts (default is
                 "day").
-            output: The type of output to generate (default is "json").
 
         Raises:
             ValueError: occurs when the scraper is unable to search posts or find the
                 subreddit.
 
         Returns:
-            (list[Post]): List of models.Post objects that match the search criteria.
+            (AsyncIterator[Post]): Iterator of models.Post objects that match the
+                search criteria.
         """
 
-        if not self.validate_access(subreddit_name):
-            raise ValueError(
-                (
-                    f"Invalid subreddit: {subreddit_name}. If this error persists, "
-                    "you may not have correctly configured Apollo."
-                )
-            )
-
         try:
-            subreddit = self.client.subreddit(subreddit_name)
-            search_results = subreddit.search(
-                query=search_query, sort=sorting, time_filter=interval
-            )
-        except requests.exceptions.RequestException as e:
+            subreddit = await self.client.subreddit(subreddit_name)
+            search_results = [
+                submission
+                async for submission in subreddit.search(
+                    query=search_query, sort=sorting, time_filter=interval
+                )
+            ]
+        except _INACCESSIBLE:
+            raise _invalid_subreddit(subreddit_name)
+        except asyncprawcore.exceptions.RequestException as e:
             raise ValueError(f"An error occurred: {e}")
 
-        post_data = []
-        for submission in search_results:
-            submission.comment_sort = "confidence"
-            submission.comment_limit = 10
-
-            post = Post(
-                post_id=submission.id,
-                author=str(submission.author),
-                score=submission.score,
-                title=submission.title,
-                body=submission.selftext,
-                url=f"https://reddit.com{submission.permalink}",
-                num_comments=submission.num_comments,
-                top_comments=self.fetch_comments(
-                    submission.comments.list(), output=output
-                ),
-            )
-
-            post_data.append(post.__dict__ if output == "json" else post)
+        return self.__scrape_all(search_results)
 
-        return post_data
-
-    def posts_from_half_year(
-        self, subreddit_name: str, output: str = "json"
-    ) -> list[Post]:
+    @memoize_iterator
+    async def posts_from_half_year(self, subreddit_name: str) -> AsyncIterator[Post]:
         """
         Fetches the top posts from the last 26 weeks of a given subreddit.
 
-        This method retrieves the top posts from the past year in the subreddit and then
-        filters out the posts that were created in the last 26 weeks.
+        This method looks up the top posts created in the last 26 weeks through the
+        PullPush mirror of Pushshift and then fetches them from Reddit in batches of
+        100. If PullPush cannot be reached, times out, or returns an unexpected
+        response, the top posts of the past year are listed from Reddit instead and
+        those older than 26 weeks are skipped. The subreddit is validated
+        concurrently with the lookup.
 
         Args:
             subreddit_name: Name of the subreddit to fetch posts from.
-            output: The type of output to generate (default is "json").
 
         Raises:
             ValueError: occurs when the scraper is unable to find the subreddit.
 
         Returns:
-            (list[Post]): List of models.Post objects created in the last 26 weeks.
+            (AsyncIterator[Post]): Iterator of models.Post objects created in the last
+                26 weeks.
         """
 
-        if not self.validate_access(subreddit_name):
-            raise ValueError(
-                (
-                    f"Invalid subreddit: {subreddit_name}. If this error persists, "
-                    "you may not have correctly configured Apollo."
-                )
-            )
+        subreddit_name = subreddit_name.replace("r/", "")
 
-        subreddit = self.client.subreddit(subreddit_name.replace("r/", ""))
-        top_posts = subreddit.top(time_filter="year")
-
-        current_time = datetime.datetime.now(datetime.timezone.utc).timestamp()
-
-        post_data = []
-        for submission in top_posts:
-            if submission.created_utc > current_time - 15720000:
-                submission.comment_sort = "confidence"
-                submission.comment_limit = 10
-
-                post = Post(
-                    post_id=submission.id,
-                    author=str(submission.author),
-                    score=submission.score,
-                    title=submission.title,
-                    body=submission.selftext,
-                    url=f"https://reddit.com{submission.permalink}",
-                    num_comments=submission.num_comments,
-                    top_comments=self.fetch_comments(submission, output=output),
-                )
+        try:
+            accessible, submissions = await asyncio.gather(
+                self.validate_access(subreddit_name),
+                self.__half_year_submissions(subreddit_name),
+            )
+        except _INACCESSIBLE:
+            raise _invalid_subreddit(subreddit_name)
 
-                post_data.append(post.__dict__ if output == "json" else post)
+        if not accessible:
+            raise _invalid_subreddit(subreddit_name)
 
-        return post_data
+        return self.__scrape_all(submissions)
 
-    def comments_from_half_year(
-        self, subreddit_name: str, output: str
-    ) -> list[list[Comment]]:
+    async def comments_from_half_year(
+        self, subreddit_name: str
+    ) -> AsyncIterator[Comment]:
         """
         Fetches the top comments from the top posts of the last 26 weeks of a given
         subreddit.
 
         This method retrieves the top posts from the past 26 weeks in the subreddit and
-        then fetches the top comments from these posts.
+        then collects the top comments from these posts. The comments are taken from
+        the posts of posts_from_half_year as they are yielded, so only the posts are
+        cached and a cached top posts result is reused.
 
         Args:
             subreddit_name: Name of the subreddit to fetch comments from.
-            output: The type of output to generate (default is "json").
+
+        Raises:
+            ValueError: occurs when the scraper is unable to find the subreddit.
 
         Returns:
-            (list[list[Comment]]): List of lists of models.Comment and each inner list
-                represents the comments of a single post.
+            (AsyncIterator[Comment]): Iterator of models.Comment, post by post.
         """
 
-        if not self.validate_access(subreddit_name):
-            raise ValueError(
-                (
-                    f"Invalid subreddit: {subreddit_name}. If this error persists, "
-                    "you may not have correctly configured Apollo."
-                )
-            )
+        return _top_comments(await self.posts_from_half_year(subreddit_name))
+
 
-        subreddit = self.client.subreddit(subreddit_name.replace("r/", ""))
-        top_posts = subreddit.top(time_filter="year")
+def _invalid_subreddit(subreddit_name: str) -> ValueError:
+    return ValueError(
+        f"Invalid subreddit: {subreddit_name}. If this error persists, you may not "
+        "have correctly configured Apollo."
+    )
 
-        current_time = datetime.datetime.now(datetime.timezone.utc).timestamp()
 
-        comment_data = []
+def _author_name(author: Optional[asyncpraw.models.Redditor]) -> str:
+    return author.name if author is not None else "[deleted]"
 
-        for submission in top_posts:
-            if submission.created_utc > current_time - 15720000:
-                submission.comment_sort = "confidence"
-                submission.comment_limit = 10
 
-                comment_data.extend(self.fetch_comments(submission, output=output))
+async def _in_order(
+    fetches: Iterator[Awaitable[Post]], window: int
+) -> AsyncIterator[Post]:
+    tasks = collections.deque(
+        asyncio.ensure_future(fetch) for fetch in itertools.islice(fetches, window)
+    )
+
+    try:
+        while tasks:
+            post = await tasks.popleft()
+            tasks.extend(
+                asyncio.ensure_future(fetch) for fetch in itertools.islice(fetches, 1)
+            )
+            yield post
+    finally:
+        for task in tasks:
+            task.cancel()
+
 
-        return comment_data
+async def _top_comments(posts: AsyncIterator[Post]) -> AsyncIterator[Comment]:
+    async for post in posts:
+        for comment in post.top_comments:
+            yield comment
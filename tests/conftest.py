@@ -0,0 +1,13 @@
+from typing import Any, Iterator
+
+import cache
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def disk_cache(tmp_path: Any, monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    monkeypatch.setattr(cache, "CACHE_DIRECTORY", str(tmp_path / ".cache"))
+    cache.get_cache.cache_clear()
+    yield
+    cache.get_cache().close()
+    cache.get_cache.cache_clear()
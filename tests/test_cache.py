@@ -0,0 +1,65 @@
+import asyncio
+from typing import Any, AsyncIterator
+
+import cache
+import pytest
+
+
+class Counter:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    @cache.memoize_iterator
+    async def numbers(self, count: int) -> AsyncIterator[int]:
+        self.calls += 1
+        return _numbers(count)
+
+
+async def _numbers(count: int) -> AsyncIterator[int]:
+    for number in range(count):
+        yield number
+
+
+async def _collect(items: AsyncIterator[int], limit: int = -1) -> list[int]:
+    collected = []
+
+    async for item in items:
+        if len(collected) == limit:
+            break
+        collected.append(item)
+
+    return collected
+
+
+def test_results_are_replayed_from_the_cache() -> None:
+    counter = Counter()
+
+    async def scrape_twice() -> tuple[list[int], list[int]]:
+        first = await _collect(await counter.numbers(5))
+        second = await _collect(await counter.numbers(5))
+        return first, second
+
+    assert asyncio.run(scrape_twice()) == ([0, 1, 2, 3, 4], [0, 1, 2, 3, 4])
+    assert counter.calls == 1
+
+
+def test_interrupted_results_are_not_replayed() -> None:
+    counter = Counter()
+
+    async def interrupt_then_scrape() -> list[int]:
+        await _collect(await counter.numbers(5), limit=2)
+        return await _collect(await counter.numbers(5))
+
+    assert asyncio.run(interrupt_then_scrape()) == [0, 1, 2, 3, 4]
+    assert counter.calls == 2
+
+
+def test_empty_results_are_cached() -> None:
+    counter = Counter()
+
+    async def scrape_twice() -> list[int]:
+        await _collect(await counter.numbers(0))
+        return await _collect(await counter.numbers(0))
+
+    assert asyncio.run(scrape_twice()) == []
+    assert counter.calls == 1
@@ -0,0 +1,39 @@
+import asyncio
+import json
+import os
+from typing import AsyncIterator
+
+import pytest
+from models import Comment
+from output import OutputManager
+
+
+@pytest.fixture(autouse=True)
+def output_directory(tmp_path: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.chdir(tmp_path)
+
+
+async def _comments(count: int, fail: bool = False) -> AsyncIterator[Comment]:
+    for index in range(count):
+        yield Comment("author", index, "body")
+
+    if fail:
+        raise RuntimeError("scrape failed")
+
+
+def test_json_output_is_a_single_array() -> None:
+    asyncio.run(OutputManager().store_stream(_comments(3), "json"))
+
+    (file_name,) = os.listdir("output")
+    with open(os.path.join("output", file_name)) as file:
+        assert [comment["score"] for comment in json.load(file)] == [0, 1, 2]
+
+
+@pytest.mark.parametrize("output_type", ["json", "jsonl", "dataclass"])
+def test_failed_scrapes_leave_no_output_file(output_type: str) -> None:
+    storage = OutputManager()
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(storage.store_stream(_comments(2000, fail=True), output_type))
+
+    assert os.listdir("output") == []
@@ -0,0 +1,118 @@
+import asyncio
+import random
+
+import aiohttp
+from pushshift import PushshiftClient
+
+
+class FakeResponse:
+    def __init__(self, data: list[dict]) -> None:
+        self.data = data
+
+    async def __aenter__(self) -> "FakeResponse":
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        pass
+
+    async def json(self) -> dict:
+        return {"data": self.data}
+
+
+class FakeSession:
+    """Serves submissions like PullPush, breaking ties in an arbitrary order."""
+
+    def __init__(self, submissions: list[dict]) -> None:
+        self.submissions = submissions
+        self.tiebreak = {item["id"]: random.random() for item in submissions}
+        self.requests = 0
+
+    def get(
+        self,
+        url: str,
+        params: dict,
+        raise_for_status: bool,
+        timeout: aiohttp.ClientTimeout,
+    ) -> FakeResponse:
+        self.requests += 1
+        score = str(params.get("score", ""))
+
+        matching = [
+            item
+            for item in self.submissions
+            if params["after"] < item["created_utc"] < params["before"]
+            and (
+                not score
+                or (score.startswith("<") and item["score"] < int(score[1:]))
+                or (score.lstrip("-").isdigit() and item["score"] == int(score))
+            )
+        ]
+        matching.sort(
+            key=lambda item: (item[params["sort_type"]], self.tiebreak[item["id"]]),
+            reverse=True,
+        )
+        return FakeResponse(matching[: params["size"]])
+
+
+def submission_ids(session: FakeSession) -> list[str]:
+    client = PushshiftClient(session)
+    return asyncio.run(client.submission_ids("test", after=0, before=10**6))
+
+
+def test_tied_scores_are_not_dropped() -> None:
+    submissions = [
+        {"id": f"a{i}", "score": 1000 + i, "created_utc": 1000 + i} for i in range(100)
+    ] + [{"id": f"b{i}", "score": 1, "created_utc": 5000 + i} for i in range(150)]
+
+    ids = submission_ids(FakeSession(submissions))
+
+    assert len(ids) == 250
+    assert ids[:100] == [f"a{i}" for i in reversed(range(100))]
+    assert set(ids[100:]) == {f"b{i}" for i in range(150)}
+
+
+def test_tied_submissions_sharing_a_second_across_pages() -> None:
+    submissions = [
+        {"id": f"s{i}", "score": 5, "created_utc": 2000 + i // 30} for i in range(250)
+    ]
+
+    assert sorted(submission_ids(FakeSession(submissions))) == sorted(
+        item["id"] for item in submissions
+    )
+
+
+def test_tied_second_with_more_submissions_than_a_page_terminates() -> None:
+    submissions = [
+        {"id": f"s{i}", "score": 5, "created_utc": 3000} for i in range(150)
+    ] + [{"id": "old", "score": 5, "created_utc": 10}]
+
+    assert "old" in submission_ids(FakeSession(submissions))
+
+
+def test_requests_scale_with_results_not_submissions() -> None:
+    submissions = [
+        {"id": f"s{i}", "score": i // 3, "created_utc": 1000 + i} for i in range(50000)
+    ]
+    session = FakeSession(submissions)
+
+    ids = submission_ids(session)
+
+    assert len(ids) == PushshiftClient.MAX_RESULTS
+    assert session.requests <= 11
+    lowest_top_score = sorted(item["score"] for item in submissions)[-1000]
+    kept = set(ids)
+    assert all(
+        item["score"] >= lowest_top_score for item in submissions if item["id"] in kept
+    )
+
+
+def test_requests_are_capped_at_max_pages() -> None:
+    submissions = [
+        {"id": f"s{i}", "score": i // 100, "created_utc": 1000 + i % 7}
+        for i in range(5000)
+    ]
+    session = FakeSession(submissions)
+
+    submission_ids(session)
+
+    assert session.requests <= PushshiftClient.MAX_PAGES
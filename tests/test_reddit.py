@@ -0,0 +1,186 @@
+import asyncio
+import time
+import types
+from typing import AsyncIterator
+
+import aiohttp
+import asyncprawcore
+import pytest
+from reddit import RedditScraper
+
+
+class FakeComments:
+    def __init__(self, comments: list) -> None:
+        self.comments = comments
+
+    async def replace_more(self, limit: int) -> list:
+        return []
+
+    def list(self) -> list:
+        return self.comments
+
+
+class FakeSubmission:
+    def __init__(self, client: "FakeClient") -> None:
+        self.client = client
+        self.comments = FakeComments(
+            [types.SimpleNamespace(author=None, score=1, body="body")]
+        )
+
+    async def load(self) -> None:
+        self.client.loads += 1
+        self.client.in_flight += 1
+        self.client.max_in_flight = max(
+            self.client.max_in_flight, self.client.in_flight
+        )
+        await asyncio.sleep(0)
+        self.client.in_flight -= 1
+
+        if self.client.rejections:
+            self.client.rejections -= 1
+            response = types.SimpleNamespace(
+                status=429, headers={"retry-after": "0"}, text=""
+            )
+            raise asyncprawcore.exceptions.TooManyRequests(response)
+
+
+class FakeSubreddit:
+    def __init__(self, submissions: list) -> None:
+        self.submissions = submissions
+
+    async def top(self, time_filter: str) -> AsyncIterator[types.SimpleNamespace]:
+        for submission in self.submissions:
+            yield submission
+
+    async def search(
+        self, query: str, sort: str, time_filter: str
+    ) -> AsyncIterator[types.SimpleNamespace]:
+        for submission in self.submissions:
+            yield submission
+
+
+class FakeClient:
+    def __init__(self, rejections: int = 0, submissions: list = ()) -> None:
+        self.rejections = rejections
+        self.submissions = list(submissions)
+        self.loads = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def submission(self, submission_id: str, fetch: bool) -> FakeSubmission:
+        return FakeSubmission(self)
+
+    async def subreddit(self, name: str, fetch: bool = False) -> FakeSubreddit:
+        return FakeSubreddit(self.submissions)
+
+
+class FailingPushshift:
+    def __init__(self, error: Exception) -> None:
+        self.error = error
+
+    async def submission_ids(self, subreddit_name: str, after: int, before: int):
+        raise self.error
+
+
+def fake_submission(index: int, created_utc: float = 0) -> types.SimpleNamespace:
+    return types.SimpleNamespace(
+        id=str(index),
+        author=None,
+        score=index,
+        title="title",
+        selftext="body",
+        permalink=f"/r/test/comments/{index}/",
+        num_comments=1,
+        created_utc=created_utc,
+    )
+
+
+def scrape_one(client: FakeClient) -> object:
+    submission = types.SimpleNamespace(
+        id="abc",
+        author=types.SimpleNamespace(name="author"),
+        score=10,
+        title="title",
+        selftext="body",
+        permalink="/r/test/comments/abc/",
+        num_comments=1,
+    )
+    scraper = RedditScraper([client], pushshift=None)
+
+    async def scrape() -> object:
+        return await scraper._scrape_one(submission, client, asyncio.Lock())
+
+    return asyncio.run(scrape())
+
+
+def test_rate_limited_fetches_are_retried() -> None:
+    client = FakeClient(rejections=2)
+
+    post = scrape_one(client)
+
+    assert client.loads == 3
+    assert post.top_comments[0].author == "[deleted]"
+
+
+def test_rate_limited_fetches_give_up_after_max_retries() -> None:
+    client = FakeClient(rejections=RedditScraper.MAX_RETRIES + 1)
+
+    with pytest.raises(asyncprawcore.exceptions.TooManyRequests):
+        scrape_one(client)
+
+    assert client.loads == RedditScraper.MAX_RETRIES + 1
+
+
+def test_fetches_are_started_within_the_window() -> None:
+    client = FakeClient(submissions=[fake_submission(index) for index in range(100)])
+    scraper = RedditScraper([client], pushshift=None)
+    window = RedditScraper.FETCH_WINDOW_PER_CLIENT
+
+    async def consume() -> list[str]:
+        post_ids = []
+
+        async for post in await scraper.search_for_keyword("test", "query"):
+            assert client.loads <= len(post_ids) + window
+            post_ids.append(post.post_id)
+
+            # Consume slowly, giving the fetches a chance to run ahead.
+            for _ in range(10):
+                await asyncio.sleep(0)
+
+        return post_ids
+
+    assert asyncio.run(consume()) == [str(index) for index in range(100)]
+
+
+@pytest.mark.parametrize(
+    "error", [asyncio.TimeoutError(), KeyError("data"), aiohttp.ClientError()]
+)
+def test_half_year_falls_back_to_reddit_when_pushshift_fails(
+    error: Exception,
+) -> None:
+    recent, old = time.time() - 60, time.time() - 300 * 24 * 3600
+    client = FakeClient(
+        submissions=[fake_submission(1, recent), fake_submission(2, old)]
+    )
+    scraper = RedditScraper([client], FailingPushshift(error))
+
+    async def scrape() -> list[str]:
+        return [post.post_id async for post in await scraper.posts_from_half_year("x")]
+
+    assert asyncio.run(scrape()) == ["1"]
+
+
+def test_each_client_fetches_one_submission_at_a_time() -> None:
+    clients = [
+        FakeClient(submissions=[fake_submission(index) for index in range(20)])
+        for _ in range(2)
+    ]
+    scraper = RedditScraper(clients, pushshift=None)
+
+    async def scrape() -> list[str]:
+        posts = await scraper.search_for_keyword("test", "query")
+        return [post.post_id async for post in posts]
+
+    assert asyncio.run(scrape()) == [str(index) for index in range(20)]
+    assert [client.max_in_flight for client in clients] == [1, 1]
+    assert [client.loads for client in clients] == [10, 10]